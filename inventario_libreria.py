@@ -1,6 +1,69 @@
 import sqlite3
 import os
-from typing import Dict, List, Optional, Tuple
+import sys
+import heapq
+from bisect import bisect_left, insort
+from collections import defaultdict
+from contextlib import contextmanager
+from enum import Enum
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Número de filas por lote en las inserciones masivas
+TAMANO_LOTE = 10_000
+
+# Cambios incrementales mínimos entre dos recálculos completos de las estadísticas
+# (el umbral real es el mayor entre este valor y el número de productos: coste O(1) amortizado)
+RECALCULO_ESTADISTICAS_MINIMO = 1_000
+
+# Sentencias SQL reutilizadas (el texto idéntico garantiza aciertos en la caché de sqlite3)
+_SQL_INSERT = '''
+    INSERT INTO productos (id_producto, nombre, autor, cantidad, precio, genero)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+# Las filas se devuelven como tuplas simples con las columnas en el mismo orden que
+# los argumentos de Producto, de modo que Producto(*fila) funciona directamente
+# (sqlite3.Row resultó más lento al cargar: envuelve la tupla en otro objeto)
+_COLUMNAS = 'id_producto, nombre, autor, cantidad, precio, genero'
+_SQL_SELECT_ALL = f'SELECT {_COLUMNAS} FROM productos ORDER BY id_producto'
+_SQL_SELECT_ONE = f'SELECT {_COLUMNAS} FROM productos WHERE id_producto = ?'
+_SQL_DELETE = 'DELETE FROM productos WHERE id_producto = ?'
+_SQL_SEARCH = '''
+    SELECT p.id_producto, p.nombre, p.autor, p.cantidad, p.precio, p.genero
+    FROM productos p
+    JOIN productos_fts f ON p.id_producto = f.rowid
+    WHERE productos_fts MATCH ?
+    ORDER BY bm25(productos_fts)
+'''
+_SQL_SEARCH_IDS = '''
+    SELECT rowid FROM productos_fts
+    WHERE productos_fts MATCH ?
+    ORDER BY bm25(productos_fts)
+'''
+
+# Campos que se pueden actualizar y su UPDATE de un solo campo ya construido
+_CAMPOS_ACTUALIZABLES = ('nombre', 'autor', 'cantidad', 'precio', 'genero')
+_SQL_UPDATE_CAMPO: Dict[str, str] = {
+    campo: f"UPDATE productos SET {campo} = ? WHERE id_producto = ?"
+    for campo in _CAMPOS_ACTUALIZABLES
+}
+
+
+class ResultadoOperacion(Enum):
+    """
+    Resultado de una operación de escritura en el inventario
+    Las capas de datos devuelven este valor y solo la interfaz imprime mensajes
+    """
+    OK = "ok"
+    ID_DUPLICADO = "id_duplicado"
+    NO_EXISTE = "no_existe"
+    ERROR_VALIDACION = "error_validacion"
+    ERROR_BD = "error_bd"
+    
+    def __bool__(self) -> bool:
+        """Solo OK es verdadero, para que `if resultado:` siga funcionando"""
+        return self is ResultadoOperacion.OK
+
 
 class Producto:
     """
@@ -8,6 +71,11 @@ class Producto:
     Utiliza encapsulamiento para proteger los datos
     """
     
+    # Atributos fijos sin __dict__ por instancia (menos memoria y acceso más rápido).
+    # Se usan los nombres ya "mangled" que generan los atributos privados __xxx
+    __slots__ = ('_Producto__id_producto', '_Producto__nombre', '_Producto__autor',
+                 '_Producto__cantidad', '_Producto__precio', '_Producto__genero')
+    
     def __init__(self, id_producto: int, nombre: str, autor: str, cantidad: int, precio: float, genero: str = "General"):
         """
         Constructor de la clase Producto (Libro)
@@ -111,7 +179,7 @@ class Producto:
 class BaseDatos:
     """
     Clase para manejar todas las operaciones de base de datos
-    Implementa el patrón Singleton para una sola conexión
+    Mantiene una única conexión abierta durante toda la vida del objeto
     """
     
     def __init__(self, nombre_bd: str = "libreria_inventario.db"):
@@ -122,54 +190,149 @@ class BaseDatos:
             nombre_bd (str): Nombre del archivo de base de datos
         """
         self.nombre_bd = nombre_bd
+        # Mensaje de la última excepción de SQLite (detalle de ERROR_BD)
+        self.ultimo_error: Optional[str] = None
+        # Conexión persistente en modo autocommit: se reutiliza en cada operación
+        # para conservar la caché de páginas de SQLite entre llamadas
+        self._conn = sqlite3.connect(nombre_bd, check_same_thread=False, isolation_level=None,
+                                     cached_statements=256)
+        self._conn.executescript('''
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-64000;
+            PRAGMA mmap_size=268435456;
+        ''')
         self.crear_tabla()
     
+    def close(self):
+        """Cierra la conexión con la base de datos"""
+        self._conn.close()
+    
+    @contextmanager
+    def transaccion(self) -> Iterator[sqlite3.Connection]:
+        """
+        Agrupa varias escrituras en una sola transacción (un único fsync)
+        
+        Hace COMMIT al salir del bloque y ROLLBACK si se produce una excepción.
+        Si ya hay una transacción abierta, las escrituras se suman a ella.
+        """
+        if self._conn.in_transaction:
+            yield self._conn
+            return
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield self._conn
+        except BaseException:
+            # SQLite puede haber cerrado ya la transacción (p. ej. SQLITE_FULL o error de E/S);
+            # en ese caso un ROLLBACK fallaría y ocultaría el error original
+            if self._conn.in_transaction:
+                self._conn.execute('ROLLBACK')
+            raise
+        try:
+            self._conn.execute('COMMIT')
+        except BaseException:
+            # Si el COMMIT falla (p. ej. una restricción diferida) la transacción sigue
+            # abierta: deshacerla para no arrastrar las escrituras siguientes a ella
+            if self._conn.in_transaction:
+                self._conn.execute('ROLLBACK')
+            raise
+    
     def crear_tabla(self):
-        """Crea la tabla productos si no existe"""
+        """Crea la tabla productos, sus índices y el índice de texto completo si no existen"""
         try:
-            with sqlite3.connect(self.nombre_bd) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS productos (
-                        id_producto INTEGER PRIMARY KEY,
-                        nombre TEXT NOT NULL,
-                        autor TEXT NOT NULL,
-                        cantidad INTEGER NOT NULL CHECK(cantidad >= 0),
-                        precio REAL NOT NULL CHECK(precio > 0),
-                        genero TEXT NOT NULL
-                    )
-                ''')
-                conn.commit()
-                print("✅ Base de datos inicializada correctamente")
+            existe_fts = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'productos_fts'"
+            ).fetchone() is not None
+            self._conn.executescript('''
+                CREATE TABLE IF NOT EXISTS productos (
+                    id_producto INTEGER PRIMARY KEY,
+                    nombre TEXT NOT NULL,
+                    autor TEXT NOT NULL,
+                    cantidad INTEGER NOT NULL CHECK(cantidad >= 0),
+                    precio REAL NOT NULL CHECK(precio > 0),
+                    genero TEXT NOT NULL
+                );
+                
+                CREATE INDEX IF NOT EXISTS idx_genero ON productos(genero);
+                
+                -- Índice invertido para buscar por nombre o autor sin recorrer toda la tabla
+                CREATE VIRTUAL TABLE IF NOT EXISTS productos_fts USING fts5(
+                    nombre, autor,
+                    content='productos', content_rowid='id_producto',
+                    tokenize='unicode61 remove_diacritics 2'
+                );
+                
+                -- Triggers para mantener el índice sincronizado con la tabla
+                CREATE TRIGGER IF NOT EXISTS productos_ai AFTER INSERT ON productos BEGIN
+                    INSERT INTO productos_fts(rowid, nombre, autor)
+                    VALUES (new.id_producto, new.nombre, new.autor);
+                END;
+                CREATE TRIGGER IF NOT EXISTS productos_ad AFTER DELETE ON productos BEGIN
+                    INSERT INTO productos_fts(productos_fts, rowid, nombre, autor)
+                    VALUES ('delete', old.id_producto, old.nombre, old.autor);
+                END;
+                CREATE TRIGGER IF NOT EXISTS productos_au AFTER UPDATE OF nombre, autor ON productos BEGIN
+                    INSERT INTO productos_fts(productos_fts, rowid, nombre, autor)
+                    VALUES ('delete', old.id_producto, old.nombre, old.autor);
+                    INSERT INTO productos_fts(rowid, nombre, autor)
+                    VALUES (new.id_producto, new.nombre, new.autor);
+                END;
+            ''')
+            if not existe_fts:
+                # Indexar los productos que ya existían antes de crear el índice
+                self._conn.execute("INSERT INTO productos_fts(productos_fts) VALUES ('rebuild')")
+            print("✅ Base de datos inicializada correctamente")
         except sqlite3.Error as e:
             print(f"❌ Error al crear la tabla: {e}")
     
-    def insertar_producto(self, producto: Producto) -> bool:
+    def _resultado_error(self, error: sqlite3.Error) -> ResultadoOperacion:
+        """Traduce una excepción de SQLite a un ResultadoOperacion y guarda su detalle"""
+        self.ultimo_error = str(error)
+        if isinstance(error, sqlite3.IntegrityError):
+            # UNIQUE: clave primaria repetida; CHECK / NOT NULL: datos inválidos
+            if 'UNIQUE' in self.ultimo_error:
+                return ResultadoOperacion.ID_DUPLICADO
+            return ResultadoOperacion.ERROR_VALIDACION
+        return ResultadoOperacion.ERROR_BD
+    
+    def insertar_producto(self, producto: Producto) -> ResultadoOperacion:
         """Inserta un producto en la base de datos"""
         try:
-            with sqlite3.connect(self.nombre_bd) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO productos (id_producto, nombre, autor, cantidad, precio, genero)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (producto.id_producto, producto.nombre, producto.autor, 
-                     producto.cantidad, producto.precio, producto.genero))
-                conn.commit()
-                return True
-        except sqlite3.IntegrityError:
-            print(f"❌ Error: Ya existe un producto con ID {producto.id_producto}")
-            return False
+            self._conn.execute(_SQL_INSERT, (producto.id_producto, producto.nombre, producto.autor, 
+                 producto.cantidad, producto.precio, producto.genero))
+            return ResultadoOperacion.OK
+        except sqlite3.Error as e:
+            return self._resultado_error(e)
+    
+    def insertar_productos_bulk(self, productos: Iterable[Producto]) -> ResultadoOperacion:
+        """
+        Inserta varios productos en una sola transacción usando executemany
+        
+        Args:
+            productos (Iterable[Producto]): Productos a insertar
+        
+        Returns:
+            ResultadoOperacion: OK si se insertaron todos; si algo falla no se inserta ninguno
+        """
+        filas = ((p.id_producto, p.nombre, p.autor, p.cantidad, p.precio, p.genero)
+                 for p in productos)
+        try:
+            with self.transaccion() as conn:
+                # Insertar por lotes para no materializar todas las filas a la vez
+                while True:
+                    lote = list(islice(filas, TAMANO_LOTE))
+                    if not lote:
+                        break
+                    conn.executemany(_SQL_INSERT, lote)
+            return ResultadoOperacion.OK
         except sqlite3.Error as e:
-            print(f"❌ Error al insertar producto: {e}")
-            return False
+            return self._resultado_error(e)
     
     def obtener_todos_productos(self) -> List[Tuple]:
         """Obtiene todos los productos de la base de datos"""
         try:
-            with sqlite3.connect(self.nombre_bd) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT * FROM productos ORDER BY id_producto')
-                return cursor.fetchall()
+            return self._conn.execute(_SQL_SELECT_ALL).fetchall()
         except sqlite3.Error as e:
             print(f"❌ Error al obtener productos: {e}")
             return []
@@ -177,66 +340,128 @@ class BaseDatos:
     def obtener_producto_por_id(self, id_producto: int) -> Optional[Tuple]:
         """Obtiene un producto específico por su ID"""
         try:
-            with sqlite3.connect(self.nombre_bd) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT * FROM productos WHERE id_producto = ?', (id_producto,))
-                return cursor.fetchone()
+            return self._conn.execute(_SQL_SELECT_ONE, (id_producto,)).fetchone()
         except sqlite3.Error as e:
             print(f"❌ Error al obtener producto: {e}")
             return None
     
-    def actualizar_producto(self, id_producto: int, **kwargs) -> bool:
+    def actualizar_campo(self, id_producto: int, campo: str, valor) -> ResultadoOperacion:
+        """
+        Actualiza un único campo de un producto con una sentencia ya construida
+        
+        Args:
+            id_producto (int): ID del producto a actualizar
+            campo (str): Nombre de la columna ('nombre', 'autor', 'cantidad', 'precio' o 'genero')
+            valor: Nuevo valor del campo
+        
+        Returns:
+            ResultadoOperacion: OK si se actualizó, NO_EXISTE si no hay producto con ese ID
+        """
+        consulta = _SQL_UPDATE_CAMPO.get(campo)
+        if consulta is None:
+            return ResultadoOperacion.ERROR_VALIDACION
+        try:
+            cursor = self._conn.execute(consulta, (valor, id_producto))
+            return ResultadoOperacion.OK if cursor.rowcount > 0 else ResultadoOperacion.NO_EXISTE
+        except sqlite3.Error as e:
+            return self._resultado_error(e)
+    
+    def actualizar_producto(self, id_producto: int, **kwargs) -> ResultadoOperacion:
         """Actualiza campos específicos de un producto"""
+        if len(kwargs) == 1:
+            # Caso habitual: un solo campo, sentencia ya construida
+            (campo, valor), = kwargs.items()
+            return self.actualizar_campo(id_producto, campo, valor)
+        
         try:
             # Construir la consulta dinámicamente
             campos = []
             valores = []
             for campo, valor in kwargs.items():
-                if campo in ['nombre', 'autor', 'cantidad', 'precio', 'genero']:
+                if campo in _CAMPOS_ACTUALIZABLES:
                     campos.append(f"{campo} = ?")
                     valores.append(valor)
             
             if not campos:
-                return False
+                return ResultadoOperacion.ERROR_VALIDACION
             
             valores.append(id_producto)
             consulta = f"UPDATE productos SET {', '.join(campos)} WHERE id_producto = ?"
             
-            with sqlite3.connect(self.nombre_bd) as conn:
-                cursor = conn.cursor()
-                cursor.execute(consulta, valores)
-                conn.commit()
-                return cursor.rowcount > 0
+            cursor = self._conn.execute(consulta, valores)
+            return ResultadoOperacion.OK if cursor.rowcount > 0 else ResultadoOperacion.NO_EXISTE
         except sqlite3.Error as e:
-            print(f"❌ Error al actualizar producto: {e}")
-            return False
+            return self._resultado_error(e)
     
-    def eliminar_producto(self, id_producto: int) -> bool:
+    def eliminar_producto(self, id_producto: int) -> ResultadoOperacion:
         """Elimina un producto de la base de datos"""
         try:
-            with sqlite3.connect(self.nombre_bd) as conn:
-                cursor = conn.cursor()
-                cursor.execute('DELETE FROM productos WHERE id_producto = ?', (id_producto,))
-                conn.commit()
-                return cursor.rowcount > 0
+            cursor = self._conn.execute(_SQL_DELETE, (id_producto,))
+            return ResultadoOperacion.OK if cursor.rowcount > 0 else ResultadoOperacion.NO_EXISTE
         except sqlite3.Error as e:
-            print(f"❌ Error al eliminar producto: {e}")
-            return False
+            return self._resultado_error(e)
     
     def buscar_productos(self, termino: str) -> List[Tuple]:
-        """Busca productos por nombre o autor"""
+        """
+        Busca productos por nombre o autor usando el índice FTS5
+        
+        Cada palabra del término se busca como prefijo, sin distinguir
+        mayúsculas ni tildes; los resultados se ordenan por relevancia.
+        """
+        consulta = self._consulta_fts(termino)
+        if not consulta:
+            return []
+        try:
+            return self._conn.execute(_SQL_SEARCH, (consulta,)).fetchall()
+        except sqlite3.Error as e:
+            print(f"❌ Error al buscar productos: {e}")
+            return []
+    
+    def buscar_ids(self, termino: str) -> List[int]:
+        """
+        Busca por nombre o autor como buscar_productos, pero devuelve solo los IDs
+        
+        Consulta únicamente el índice FTS5, sin leer ni materializar las filas completas.
+        """
+        consulta = self._consulta_fts(termino)
+        if not consulta:
+            return []
         try:
-            with sqlite3.connect(self.nombre_bd) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT * FROM productos 
-                    WHERE nombre LIKE ? OR autor LIKE ?
-                    ORDER BY nombre
-                ''', (f'%{termino}%', f'%{termino}%'))
-                return cursor.fetchall()
+            filas = self._conn.execute(_SQL_SEARCH_IDS, (consulta,)).fetchall()
+            return [fila[0] for fila in filas]
         except sqlite3.Error as e:
             print(f"❌ Error al buscar productos: {e}")
             return []
+    
+    @staticmethod
+    def _consulta_fts(termino: str) -> str:
+        """Convierte el término del usuario en una consulta FTS5 de prefijos"""
+        # Cada palabra va entre comillas para que los símbolos no se interpreten como sintaxis FTS5
+        return " ".join('"' + palabra.replace('"', '""') + '"*' for palabra in termino.split())
+
+
+class _ImportacionCancelada(Exception):
+    """Interrumpe una importación masiva para deshacer su transacción"""
+    
+    def __init__(self, resultado: ResultadoOperacion, detalle: Optional[str]):
+        super().__init__(detalle)
+        self.resultado = resultado
+        self.detalle = detalle
+
+
+class _OrdenInverso:
+    """Envuelve un valor invirtiendo su orden, para usar heapq como montículo de máximos"""
+    
+    __slots__ = ('valor',)
+    
+    def __init__(self, valor):
+        self.valor = valor
+    
+    def __lt__(self, otro: "_OrdenInverso") -> bool:
+        return otro.valor < self.valor
+    
+    def __eq__(self, otro: object) -> bool:
+        return isinstance(otro, _OrdenInverso) and self.valor == otro.valor
 
 
 class Inventario:
@@ -247,17 +472,34 @@ class Inventario:
     
     def __init__(self):
         """Inicializa el inventario con diferentes estructuras de datos"""
-        # Diccionario principal: ID -> Producto (búsqueda O(1))
+        # Diccionario principal: ID -> Producto (búsqueda y verificación de existencia O(1))
         self.__productos: Dict[int, Producto] = {}
         
-        # Set para IDs únicos (verificación rápida de existencia)
-        self.__ids_existentes: set = set()
+        # Lista de IDs mantenida siempre ordenada (bisect), para mostrar el
+        # inventario por ID sin ordenar en cada consulta
+        self.__ids_ordenados: List[int] = []
         
         # Diccionario para búsqueda por género (organización)
-        self.__productos_por_genero: Dict[str, List[int]] = {}
+        # Cada género guarda su lista de IDs también ordenada
+        self.__productos_por_genero: Dict[str, List[int]] = defaultdict(list)
+        
+        # Totales mantenidos de forma incremental en cada alta, baja o cambio,
+        # para que las estadísticas no tengan que recorrer el inventario
+        self.__total_libros: int = 0
+        self.__valor_total: float = 0.0
+        self.__suma_precios: float = 0.0
+        # Los totales en coma flotante acumulan residuo de redondeo; se recalculan
+        # desde cero cada cierto número de cambios
+        self.__cambios_incrementales: int = 0
         
-        # Lista para mantener orden de inserción
-        self.__orden_insercion: List[int] = []
+        # Montículos (precio, nombre, ID) para consultar el más barato y el más caro en O(1).
+        # A igual precio gana el nombre menor (más barato) o mayor (más caro).
+        # Las entradas obsoletas se descartan al consultarlos (borrado perezoso)
+        self.__heap_precio_min: List[Tuple] = []
+        self.__heap_precio_max: List[Tuple] = []
+        
+        # Detalle del último ResultadoOperacion distinto de OK (para mostrarlo en la interfaz)
+        self.ultimo_error: Optional[str] = None
         
         # Instancia de base de datos
         self.__bd = BaseDatos()
@@ -269,144 +511,336 @@ class Inventario:
         """Carga todos los productos desde la base de datos al iniciar"""
         productos_bd = self.__bd.obtener_todos_productos()
         print(f"📚 Cargando {len(productos_bd)} productos desde la base de datos...")
+        self._construir_desde_filas(productos_bd)
+    
+    def _construir_desde_filas(self, productos_bd: List[Tuple]):
+        """Reconstruye todas las colecciones en memoria a partir de filas ordenadas por ID"""
+        # Construir el diccionario principal de una vez (la comprensión evita
+        # las llamadas a __setitem__ fila a fila)
+        self.__productos = {fila[0]: Producto(*fila) for fila in productos_bd}
         
-        for producto_data in productos_bd:
-            id_prod, nombre, autor, cantidad, precio, genero = producto_data
-            producto = Producto(id_prod, nombre, autor, cantidad, precio, genero)
-            
-            # Añadir a todas las colecciones
-            self.__productos[id_prod] = producto
-            self.__ids_existentes.add(id_prod)
-            self.__orden_insercion.append(id_prod)
-            
-            # Actualizar índice por género
-            if genero not in self.__productos_por_genero:
-                self.__productos_por_genero[genero] = []
-            self.__productos_por_genero[genero].append(id_prod)
+        # Las filas llegan ordenadas por ID, así que las listas se construyen ya ordenadas
+        self.__ids_ordenados = list(self.__productos)
+        
+        # Actualizar índice por género
+        self.__productos_por_genero = defaultdict(list)
+        for id_prod, producto in self.__productos.items():
+            self.__productos_por_genero[producto.genero].append(id_prod)
+        
+        self._recalcular_estadisticas()
+    
+    def cerrar(self):
+        """Cierra la conexión con la base de datos"""
+        self.__bd.close()
+    
+    @property
+    def valor_total(self) -> float:
+        """Valor total del stock (nunca negativo por residuo de redondeo)"""
+        return max(self.__valor_total, 0.0)
+    
+    def _recalcular_estadisticas(self):
+        """
+        Recalcula desde cero los totales y los montículos de precios
+        
+        Recorre los productos una sola vez, acumulando todos los totales y las
+        entradas de ambos montículos en la misma pasada.
+        """
+        total_libros = 0
+        valor_total = 0.0
+        suma_precios = 0.0
+        heap_min = []
+        heap_max = []
+        for producto in self.__productos.values():
+            cantidad = producto.cantidad
+            precio = producto.precio
+            total_libros += cantidad
+            valor_total += cantidad * precio
+            suma_precios += precio
+            heap_min.append(self._entrada_heap_min(producto))
+            heap_max.append(self._entrada_heap_max(producto))
+        
+        heapq.heapify(heap_min)
+        heapq.heapify(heap_max)
+        self.__total_libros = total_libros
+        self.__valor_total = valor_total
+        self.__suma_precios = suma_precios
+        self.__cambios_incrementales = 0
+        self.__heap_precio_min = heap_min
+        self.__heap_precio_max = heap_max
+    
+    @staticmethod
+    def _entrada_heap_min(producto: Producto) -> Tuple[float, str, int]:
+        """Entrada del montículo de mínimos: a igual precio, primero el nombre menor"""
+        return (producto.precio, producto.nombre, producto.id_producto)
+    
+    @staticmethod
+    def _entrada_heap_max(producto: Producto) -> Tuple[float, _OrdenInverso, int]:
+        """Entrada del montículo de máximos: a igual precio, primero el nombre mayor"""
+        return (-producto.precio, _OrdenInverso(producto.nombre), producto.id_producto)
+    
+    def _sumar_a_estadisticas(self, producto: Producto):
+        """Incorpora un producto nuevo a los totales y a los montículos de precios"""
+        self.__total_libros += producto.cantidad
+        self.__valor_total += producto.cantidad * producto.precio
+        self.__suma_precios += producto.precio
+        self._registrar_precio(producto)
+        self._ajustar_totales()
+    
+    def _restar_de_estadisticas(self, producto: Producto):
+        """Descuenta de los totales un producto eliminado"""
+        self.__total_libros -= producto.cantidad
+        self.__valor_total -= producto.cantidad * producto.precio
+        self.__suma_precios -= producto.precio
+        # Sus entradas en los montículos quedan obsoletas y se descartan al consultarlos
+        self._ajustar_totales()
+    
+    def _ajustar_totales(self):
+        """
+        Limpia el residuo de redondeo de los totales tras un cambio incremental
+        
+        Sin libros en stock el valor total es exactamente 0 (y sin productos, la suma
+        de precios); además, cada cierto número de cambios se recalcula todo desde cero
+        para que el error no crezca durante una sesión larga.
+        """
+        if self.__total_libros == 0:
+            self.__valor_total = 0.0
+        if not self.__productos:
+            self.__suma_precios = 0.0
+        
+        self.__cambios_incrementales += 1
+        if self.__cambios_incrementales >= max(RECALCULO_ESTADISTICAS_MINIMO, len(self.__productos)):
+            self._recalcular_estadisticas()
+    
+    def _registrar_precio(self, producto: Producto):
+        """Añade el precio actual del producto a los montículos de mínimo y máximo"""
+        heapq.heappush(self.__heap_precio_min, self._entrada_heap_min(producto))
+        heapq.heappush(self.__heap_precio_max, self._entrada_heap_max(producto))
+        
+        # Reconstruir (en la misma pasada que los totales) si las entradas
+        # obsoletas superan a las vigentes
+        if len(self.__heap_precio_min) > 2 * len(self.__productos) + 64:
+            self._recalcular_estadisticas()
+    
+    @staticmethod
+    def _quitar_ordenado(ids: List[int], id_producto: int):
+        """Quita un ID de una lista ordenada localizándolo por búsqueda binaria"""
+        pos = bisect_left(ids, id_producto)
+        if pos < len(ids) and ids[pos] == id_producto:
+            del ids[pos]
+    
+    def _tope_precio(self, heap: List[Tuple], entrada: Callable[[Producto], Tuple]) -> Producto:
+        """
+        Devuelve el producto en la cima del montículo descartando entradas obsoletas
+        
+        Una entrada es vigente si coincide con la que `entrada` genera hoy para su producto.
+        """
+        while True:
+            producto = self.__productos.get(heap[0][-1])
+            if producto is not None and entrada(producto) == heap[0]:
+                return producto
+            heapq.heappop(heap)
+    
+    @staticmethod
+    def _validar_cantidad_precio(cantidad: int, precio: float):
+        """Lanza ValueError si la cantidad o el precio de un producto nuevo no son válidos"""
+        if cantidad < 0:
+            raise ValueError("La cantidad no puede ser negativa")
+        if precio <= 0:
+            raise ValueError("El precio debe ser mayor a 0")
     
     def añadir_producto(self, id_producto: int, nombre: str, autor: str, 
-                       cantidad: int, precio: float, genero: str = "General") -> bool:
+                       cantidad: int, precio: float, genero: str = "General") -> ResultadoOperacion:
         """
         Añade un nuevo producto al inventario
         
         Returns:
-            bool: True si se añadió correctamente, False si ya existe
+            ResultadoOperacion: OK si se añadió correctamente, ID_DUPLICADO si ya existe
         """
-        # Verificación rápida con set O(1)
-        if id_producto in self.__ids_existentes:
-            print(f"❌ Error: Ya existe un producto con ID {id_producto}")
-            return False
+        # Verificación rápida con el diccionario O(1)
+        if id_producto in self.__productos:
+            return ResultadoOperacion.ID_DUPLICADO
         
         try:
+            self._validar_cantidad_precio(cantidad, precio)
+            
             # Crear objeto producto
             nuevo_producto = Producto(id_producto, nombre, autor, cantidad, precio, genero)
+        except ValueError as e:
+            self.ultimo_error = str(e)
+            return ResultadoOperacion.ERROR_VALIDACION
+        
+        # Guardar en base de datos primero
+        resultado = self.__bd.insertar_producto(nuevo_producto)
+        if resultado is ResultadoOperacion.OK:
+            # Añadir a todas las colecciones
+            self.__productos[id_producto] = nuevo_producto
+            self._sumar_a_estadisticas(nuevo_producto)
             
-            # Guardar en base de datos primero
-            if self.__bd.insertar_producto(nuevo_producto):
-                # Añadir a todas las colecciones
-                self.__productos[id_producto] = nuevo_producto
-                self.__ids_existentes.add(id_producto)
-                self.__orden_insercion.append(id_producto)
-                
-                # Actualizar índice por género
-                if genero not in self.__productos_por_genero:
-                    self.__productos_por_genero[genero] = []
-                self.__productos_por_genero[genero].append(id_producto)
-                
-                print(f"✅ Producto '{nombre}' añadido exitosamente")
-                return True
-            else:
-                return False
-                
+            insort(self.__ids_ordenados, id_producto)
+            
+            # Actualizar índice por género
+            insort(self.__productos_por_genero[genero], id_producto)
+        else:
+            self.ultimo_error = self.__bd.ultimo_error
+        return resultado
+    
+    def añadir_muchos(self, productos_data: Iterable[Tuple]) -> ResultadoOperacion:
+        """
+        Añade varios productos en una sola transacción
+        
+        La entrada (puede ser un generador) se consume por lotes de TAMANO_LOTE
+        filas, de modo que nunca se materializa entera además del inventario.
+        
+        Args:
+            productos_data (Iterable[Tuple]): Tuplas (id, nombre, autor, cantidad, precio, genero)
+        
+        Returns:
+            ResultadoOperacion: OK si se añadieron todos; si alguno ya existía, no era
+                                válido o falló la inserción no se añade ninguno
+        """
+        datos = iter(productos_data)
+        hay_lotes_aplicados = False
+        completado = False
+        generos_modificados = set()
+        try:
+            with self.__bd.transaccion():
+                while True:
+                    try:
+                        lote = [Producto(*producto_data) for producto_data in islice(datos, TAMANO_LOTE)]
+                    except TypeError as e:
+                        raise ValueError(f"Fila con formato no válido ({e})") from e
+                    if not lote:
+                        break
+                    
+                    # Los duplicados con el inventario (incluidos los lotes anteriores) se
+                    # detectan aquí; los repetidos dentro del lote, por la PRIMARY KEY
+                    for producto in lote:
+                        if producto.id_producto in self.__productos:
+                            raise _ImportacionCancelada(
+                                ResultadoOperacion.ID_DUPLICADO,
+                                f"Ya existe un producto con ID {producto.id_producto}")
+                        self._validar_cantidad_precio(producto.cantidad, producto.precio)
+                    
+                    resultado = self.__bd.insertar_productos_bulk(lote)
+                    if resultado is not ResultadoOperacion.OK:
+                        raise _ImportacionCancelada(resultado, self.__bd.ultimo_error)
+                    
+                    # Añadir el lote a todas las colecciones; las listas de IDs se
+                    # amplían sin ordenar y se reordenan una sola vez al terminar
+                    hay_lotes_aplicados = True
+                    for producto in lote:
+                        id_prod = producto.id_producto
+                        self.__productos[id_prod] = producto
+                        self.__ids_ordenados.append(id_prod)
+                        self.__productos_por_genero[producto.genero].append(id_prod)
+                        generos_modificados.add(producto.genero)
+                        self._sumar_a_estadisticas(producto)
+            completado = True
+        except _ImportacionCancelada as e:
+            self.ultimo_error = e.detalle
+            return e.resultado
         except ValueError as e:
-            print(f"❌ Error de validación: {e}")
-            return False
+            self.ultimo_error = str(e)
+            return ResultadoOperacion.ERROR_VALIDACION
+        except sqlite3.Error as e:
+            # Fallo de BEGIN o COMMIT
+            self.ultimo_error = str(e)
+            return ResultadoOperacion.ERROR_BD
+        finally:
+            # Ante cualquier interrupción (incluida KeyboardInterrupt) la transacción se
+            # deshizo: descartar también los lotes ya aplicados en memoria
+            if not completado and hay_lotes_aplicados:
+                self._construir_desde_filas(self.__bd.obtener_todos_productos())
+        
+        # Timsort fusiona en O(N + M) el tramo ya ordenado con el añadido
+        self.__ids_ordenados.sort()
+        for genero in generos_modificados:
+            self.__productos_por_genero[genero].sort()
+        
+        return ResultadoOperacion.OK
     
-    def eliminar_producto(self, id_producto: int) -> bool:
+    def eliminar_producto(self, id_producto: int) -> ResultadoOperacion:
         """Elimina un producto del inventario"""
-        if id_producto not in self.__ids_existentes:
-            print(f"❌ No existe un producto con ID {id_producto}")
-            return False
+        if id_producto not in self.__productos:
+            return ResultadoOperacion.NO_EXISTE
         
         # Eliminar de base de datos
-        if self.__bd.eliminar_producto(id_producto):
+        resultado = self.__bd.eliminar_producto(id_producto)
+        if resultado is ResultadoOperacion.OK:
             # Obtener datos antes de eliminar
             producto = self.__productos[id_producto]
             genero = producto.genero
             
             # Eliminar de todas las colecciones
             del self.__productos[id_producto]
-            self.__ids_existentes.remove(id_producto)
-            self.__orden_insercion.remove(id_producto)
+            self._restar_de_estadisticas(producto)
+            self._quitar_ordenado(self.__ids_ordenados, id_producto)
             
             # Actualizar índice por género
-            if genero in self.__productos_por_genero:
-                self.__productos_por_genero[genero].remove(id_producto)
-                if not self.__productos_por_genero[genero]:
+            ids_genero = self.__productos_por_genero.get(genero)
+            if ids_genero is not None:
+                self._quitar_ordenado(ids_genero, id_producto)
+                if not ids_genero:
                     del self.__productos_por_genero[genero]
-            
-            print(f"✅ Producto '{producto.nombre}' eliminado exitosamente")
-            return True
-        return False
+        else:
+            self.ultimo_error = self.__bd.ultimo_error
+        return resultado
     
-    def actualizar_cantidad(self, id_producto: int, nueva_cantidad: int) -> bool:
+    def actualizar_cantidad(self, id_producto: int, nueva_cantidad: int) -> ResultadoOperacion:
         """Actualiza la cantidad de un producto"""
-        if id_producto not in self.__ids_existentes:
-            print(f"❌ No existe un producto con ID {id_producto}")
-            return False
+        if id_producto not in self.__productos:
+            return ResultadoOperacion.NO_EXISTE
         
-        try:
-            if nueva_cantidad < 0:
-                raise ValueError("La cantidad no puede ser negativa")
-            
-            # Actualizar en base de datos
-            if self.__bd.actualizar_producto(id_producto, cantidad=nueva_cantidad):
-                # Actualizar en memoria
-                self.__productos[id_producto].cantidad = nueva_cantidad
-                print(f"✅ Cantidad actualizada a {nueva_cantidad}")
-                return True
-            return False
-            
-        except ValueError as e:
-            print(f"❌ Error: {e}")
-            return False
+        if nueva_cantidad < 0:
+            self.ultimo_error = "La cantidad no puede ser negativa"
+            return ResultadoOperacion.ERROR_VALIDACION
+        
+        # Actualizar en base de datos
+        resultado = self.__bd.actualizar_campo(id_producto, 'cantidad', nueva_cantidad)
+        if resultado is ResultadoOperacion.OK:
+            # Actualizar en memoria
+            producto = self.__productos[id_producto]
+            diferencia = nueva_cantidad - producto.cantidad
+            producto.cantidad = nueva_cantidad
+            self.__total_libros += diferencia
+            self.__valor_total += diferencia * producto.precio
+            self._ajustar_totales()
+        else:
+            self.ultimo_error = self.__bd.ultimo_error
+        return resultado
     
-    def actualizar_precio(self, id_producto: int, nuevo_precio: float) -> bool:
+    def actualizar_precio(self, id_producto: int, nuevo_precio: float) -> ResultadoOperacion:
         """Actualiza el precio de un producto"""
-        if id_producto not in self.__ids_existentes:
-            print(f"❌ No existe un producto con ID {id_producto}")
-            return False
+        if id_producto not in self.__productos:
+            return ResultadoOperacion.NO_EXISTE
         
-        try:
-            if nuevo_precio <= 0:
-                raise ValueError("El precio debe ser mayor a 0")
-            
-            # Actualizar en base de datos
-            if self.__bd.actualizar_producto(id_producto, precio=nuevo_precio):
-                # Actualizar en memoria
-                self.__productos[id_producto].precio = nuevo_precio
-                print(f"✅ Precio actualizado a ${nuevo_precio:.2f}")
-                return True
-            return False
-            
-        except ValueError as e:
-            print(f"❌ Error: {e}")
-            return False
+        if nuevo_precio <= 0:
+            self.ultimo_error = "El precio debe ser mayor a 0"
+            return ResultadoOperacion.ERROR_VALIDACION
+        
+        # Actualizar en base de datos
+        resultado = self.__bd.actualizar_campo(id_producto, 'precio', nuevo_precio)
+        if resultado is ResultadoOperacion.OK:
+            # Actualizar en memoria
+            producto = self.__productos[id_producto]
+            diferencia = nuevo_precio - producto.precio
+            producto.precio = nuevo_precio
+            self.__valor_total += producto.cantidad * diferencia
+            self.__suma_precios += diferencia
+            self._registrar_precio(producto)
+            self._ajustar_totales()
+        else:
+            self.ultimo_error = self.__bd.ultimo_error
+        return resultado
     
     def buscar_por_nombre(self, termino: str) -> List[Producto]:
         """
         Busca productos por nombre o autor
-        Utiliza la base de datos para búsqueda eficiente
+        Utiliza el índice de texto de la base de datos solo para obtener los IDs
+        y devuelve los objetos que ya están en memoria
         """
-        productos_encontrados = self.__bd.buscar_productos(termino)
-        resultado = []
-        
-        for producto_data in productos_encontrados:
-            id_prod = producto_data[0]
-            if id_prod in self.__productos:
-                resultado.append(self.__productos[id_prod])
-        
-        return resultado
+        return [self.__productos[id_prod] for id_prod in self.__bd.buscar_ids(termino)
+                if id_prod in self.__productos]
     
     def obtener_producto_por_id(self, id_producto: int) -> Optional[Producto]:
         """Obtiene un producto específico por ID"""
@@ -423,16 +857,12 @@ class Inventario:
         print("="*80)
         
         # Mostrar estadísticas generales
-        total_libros = sum(p.cantidad for p in self.__productos.values())
-        valor_total = sum(p.cantidad * p.precio for p in self.__productos.values())
-        
-        print(f"📊 Resumen: {len(self.__productos)} títulos diferentes | {total_libros} libros en stock | Valor total: ${valor_total:.2f}")
+        print(f"📊 Resumen: {len(self.__productos)} títulos diferentes | {self.__total_libros} libros en stock | Valor total: ${self.valor_total:.2f}")
         print("-"*80)
         
-        # Mostrar productos ordenados por ID
-        for id_producto in sorted(self.__productos.keys()):
-            producto = self.__productos[id_producto]
-            print(f"  {producto}")
+        # Mostrar productos ordenados por ID con una sola escritura en stdout
+        sys.stdout.write("".join([f"  {self.__productos[id_producto]}\n"
+                                  for id_producto in self.__ids_ordenados]))
         
         print("="*80)
     
@@ -446,14 +876,18 @@ class Inventario:
         print("📚 INVENTARIO POR GÉNERO LITERARIO")
         print("="*60)
         
+        # Construir todas las secciones y escribirlas con una sola llamada a stdout
+        lineas = []
         for genero in sorted(self.__productos_por_genero.keys()):
             ids_productos = self.__productos_por_genero[genero]
-            print(f"\n📖 {genero.upper()} ({len(ids_productos)} títulos):")
-            print("-" * 40)
+            lineas.append(f"\n📖 {genero.upper()} ({len(ids_productos)} títulos):")
+            lineas.append("-" * 40)
             
-            for id_producto in sorted(ids_productos):
+            for id_producto in ids_productos:
                 producto = self.__productos[id_producto]
-                print(f"  • {producto.nombre} - {producto.autor} (Stock: {producto.cantidad})")
+                lineas.append(f"  • {producto.nombre} - {producto.autor} (Stock: {producto.cantidad})")
+        
+        sys.stdout.write("\n".join(lineas) + "\n")
     
     def obtener_estadisticas(self) -> Dict:
         """Obtiene estadísticas del inventario"""
@@ -461,27 +895,25 @@ class Inventario:
             return {}
         
         total_titulos = len(self.__productos)
-        total_libros = sum(p.cantidad for p in self.__productos.values())
-        valor_total = sum(p.cantidad * p.precio for p in self.__productos.values())
-        precio_promedio = sum(p.precio for p in self.__productos.values()) / total_titulos
+        precio_promedio = self.__suma_precios / total_titulos
         
-        # Género más popular (más títulos)
-        genero_mas_titulos = max(self.__productos_por_genero.keys(), 
-                                key=lambda g: len(self.__productos_por_genero[g]))
+        # Género más popular (más títulos): el tamaño de cada lista de IDs es O(1),
+        # así que basta un recorrido por los géneros sin volver a indexar el diccionario
+        genero_mas_titulos, _ = max(self.__productos_por_genero.items(),
+                                    key=lambda genero_ids: len(genero_ids[1]))
         
         # Producto más caro y más barato
-        precios = [(p.precio, p.nombre) for p in self.__productos.values()]
-        precio_max, libro_mas_caro = max(precios)
-        precio_min, libro_mas_barato = min(precios)
+        mas_caro = self._tope_precio(self.__heap_precio_max, self._entrada_heap_max)
+        mas_barato = self._tope_precio(self.__heap_precio_min, self._entrada_heap_min)
         
         return {
             'total_titulos': total_titulos,
-            'total_libros': total_libros,
-            'valor_total': valor_total,
+            'total_libros': self.__total_libros,
+            'valor_total': self.valor_total,
             'precio_promedio': precio_promedio,
             'genero_mas_titulos': genero_mas_titulos,
-            'libro_mas_caro': (libro_mas_caro, precio_max),
-            'libro_mas_barato': (libro_mas_barato, precio_min)
+            'libro_mas_caro': (mas_caro.nombre, mas_caro.precio),
+            'libro_mas_barato': (mas_barato.nombre, mas_barato.precio)
         }
 
 
@@ -509,6 +941,19 @@ class InterfazUsuario:
         print("9. ❌ Salir")
         print("-"*50)
     
+    def mostrar_resultado(self, resultado: ResultadoOperacion, mensaje_exito: str, id_producto: int):
+        """Muestra el mensaje correspondiente al resultado de una operación"""
+        if resultado is ResultadoOperacion.OK:
+            print(mensaje_exito)
+        elif resultado is ResultadoOperacion.ID_DUPLICADO:
+            print(f"❌ Error: Ya existe un producto con ID {id_producto}")
+        elif resultado is ResultadoOperacion.NO_EXISTE:
+            print(f"❌ No existe un producto con ID {id_producto}")
+        elif resultado is ResultadoOperacion.ERROR_VALIDACION:
+            print(f"❌ Error: {self.inventario.ultimo_error}")
+        else:
+            print(f"❌ Error en la base de datos: {self.inventario.ultimo_error}")
+    
     def obtener_opcion(self) -> str:
         """Obtiene la opción del usuario con validación"""
         while True:
@@ -520,6 +965,7 @@ class InterfazUsuario:
                     print("❌ Por favor, ingresa un número del 1 al 9")
             except KeyboardInterrupt:
                 print("\n👋 ¡Hasta luego!")
+                self.inventario.cerrar()
                 exit()
     
     def añadir_libro(self):
@@ -535,7 +981,8 @@ class InterfazUsuario:
             precio = float(input("Precio: $"))
             genero = input("Género (opcional): ").strip() or "General"
             
-            self.inventario.añadir_producto(id_producto, nombre, autor, cantidad, precio, genero)
+            resultado = self.inventario.añadir_producto(id_producto, nombre, autor, cantidad, precio, genero)
+            self.mostrar_resultado(resultado, f"✅ Producto '{nombre}' añadido exitosamente", id_producto)
             
         except ValueError as e:
             print(f"❌ Error: Por favor ingresa valores válidos - {e}")
@@ -556,7 +1003,9 @@ class InterfazUsuario:
                 print(f"\n📖 Libro a eliminar: {producto}")
                 confirmar = input("¿Estás seguro? (s/N): ").strip().lower()
                 if confirmar == 's':
-                    self.inventario.eliminar_producto(id_producto)
+                    resultado = self.inventario.eliminar_producto(id_producto)
+                    self.mostrar_resultado(resultado, f"✅ Producto '{producto.nombre}' eliminado exitosamente",
+                                           id_producto)
                 else:
                     print("❌ Operación cancelada")
             
@@ -576,7 +1025,8 @@ class InterfazUsuario:
             if producto:
                 print(f"📖 Libro: {producto.nombre} (Stock actual: {producto.cantidad})")
                 nueva_cantidad = int(input("Nueva cantidad: "))
-                self.inventario.actualizar_cantidad(id_producto, nueva_cantidad)
+                resultado = self.inventario.actualizar_cantidad(id_producto, nueva_cantidad)
+                self.mostrar_resultado(resultado, f"✅ Cantidad actualizada a {nueva_cantidad}", id_producto)
             
         except ValueError:
             print("❌ Error: Por favor ingresa valores numéricos válidos")
@@ -594,7 +1044,8 @@ class InterfazUsuario:
             if producto:
                 print(f"📖 Libro: {producto.nombre} (Precio actual: ${producto.precio:.2f})")
                 nuevo_precio = float(input("Nuevo precio: $"))
-                self.inventario.actualizar_precio(id_producto, nuevo_precio)
+                resultado = self.inventario.actualizar_precio(id_producto, nuevo_precio)
+                self.mostrar_resultado(resultado, f"✅ Precio actualizado a ${nuevo_precio:.2f}", id_producto)
             
         except ValueError:
             print("❌ Error: Por favor ingresa un precio válido")
@@ -667,6 +1118,7 @@ class InterfazUsuario:
                 elif opcion == '9':
                     print("\n👋 ¡Gracias por usar el Sistema de Inventario!")
                     print("📚 ¡Que tengas un excelente día!")
+                    self.inventario.cerrar()
                     break
                 
                 # Pausa para leer la salida
@@ -674,6 +1126,7 @@ class InterfazUsuario:
                 
             except KeyboardInterrupt:
                 print("\n\n👋 ¡Hasta luego!")
+                self.inventario.cerrar()
                 break
             except Exception as e:
                 print(f"❌ Error inesperado: {e}")
@@ -702,6 +1155,9 @@ def cargar_datos_ejemplo():
     """
     Función auxiliar para cargar datos de ejemplo
     (Ejecutar solo una vez para pruebas)
+    
+    Los IDs que ya existen en la base de datos se informan y se omiten;
+    el resto se inserta en un único lote.
     """
     bd = BaseDatos()
     
@@ -717,11 +1173,18 @@ def cargar_datos_ejemplo():
     ]
     
     print("📚 Cargando libros de ejemplo...")
+    productos = []
     for libro_data in libros_ejemplo:
-        producto = Producto(*libro_data)
-        bd.insertar_producto(producto)
+        if bd.obtener_producto_por_id(libro_data[0]) is not None:
+            print(f"❌ Error: Ya existe un producto con ID {libro_data[0]}")
+        else:
+            productos.append(Producto(*libro_data))
     
-    print("✅ Datos de ejemplo cargados correctamente")
+    if bd.insertar_productos_bulk(productos) is ResultadoOperacion.OK:
+        print("✅ Datos de ejemplo cargados correctamente")
+    else:
+        print(f"❌ Error al cargar los datos de ejemplo: {bd.ultimo_error}")
+    bd.close()
 
 
 if __name__ == "__main__":